@@ -8,12 +8,21 @@ import re
 import os
 import requests
 import argparse
+import unicodedata
+import itertools
+import collections
+import concurrent.futures
+
+from wordle import load_language_pack
 
 
 
 ### Parameters
 language_pack_file_ext = ".langpack"
 
+# Size of the blocks written into the language pack files
+write_chunk_size = 1024 * 1024
+
 
 
 ### Language definitions
@@ -36,6 +45,8 @@ languages = {
       "difficulty": "Difficulty level: ",
       "poswords": " possible words!",
       "howquit": "(ESC twice to quit)",
+      "howswitch": "(TAB to change language)",
+      "hint": "Try letters: ",
       "guess": "Enter guess: ",
       "won": "You win!",
       "lost": "You lose! The word was:",
@@ -89,6 +100,8 @@ languages = {
       "difficulty": "Vaikeusaste: ",
       "poswords": " mahdollista sanaa!",
       "howquit": "(ESC kahdesti lopettamaan)",
+      "howswitch": "(TAB vaihtaa kieltä)",
+      "hint": "Kokeile kirjaimia: ",
       "guess": "Anna arvaus: ",
       "won": "Voitat!!",
       "lost": "Häviät! Sana oli:",
@@ -143,6 +156,8 @@ languages = {
       "difficulty": "Difficulté: ",
       "poswords": " mots possibles!",
       "howquit": "(2 fois ESC pour quitter)",
+      "howswitch": "(TAB pour changer de langue)",
+      "hint": "Essayer les lettres : ",
       "guess": "Entrer essai : ",
       "won": "Gagné !",
       "lost": "Perdu ! Le mot était :",
@@ -186,7 +201,7 @@ languages = {
 ### Routines
 def load_src(src):
   """Load a source text file from various sources and return the lines as a list
-  of strings
+  of strings in the canonical composed Unicode form
   """
 
   m = re.findall("^(file|http|https):\/\/(.*)$", src)
@@ -196,123 +211,283 @@ def load_src(src):
       lines = requests.get(src).content.decode("utf-8").splitlines()
 
     elif m[0][0].startswith("file"):
-      with open(m[0][1], "r") as f:
+      with open(m[0][1], "r", encoding = "utf-8") as f:
         lines = f.read().splitlines()
 
-    return lines
+    return [unicodedata.normalize("NFC", l) for l in lines]
+
+
+
+def letter_counts(lst, alphabet):
+  """Count how many times each letter of the alphabet appears at each position
+  in the words of each length in a list of words. Return a dictionary of flat
+  tuples of counts indexed by position * len(alphabet) + letter index, keyed by
+  word length
+  """
+
+  # Sort the words by length
+  wls = collections.defaultdict(list)
+  for w in lst:
+    wls[len(w)].append(w)
+
+  # Count the letters in each column of words of the same length at once
+  return {n: tuple(c[l] for c in map(collections.Counter, zip(*wls[n])) \
+		for l in alphabet) for n in sorted(wls)}
+
+
+
+def letter_words(lst, alphabet):
+  """Count how many words of each length in a list of words contain each letter
+  of the alphabet, however many times. Return a dictionary of tuples of counts
+  indexed by letter index, keyed by word length
+  """
+
+  # Sort the words by length
+  wls = collections.defaultdict(list)
+  for w in lst:
+    wls[len(w)].append(w)
+
+  # Count each letter once per word
+  lw = {}
 
+  for n in sorted(wls):
+    c = collections.Counter(itertools.chain.from_iterable(map(set, wls[n])))
+    lw[n] = tuple(c[l] for l in alphabet)
 
+  return lw
 
-def print_tuple_declaration_cols_formatted(name, lst, cols, f):
-  """Print a tuple declaration as compactly as possibly within a certain number
-  of columns per line into a file
+
+
+def tuple_declaration_cols_formatted(name, lst, cols, fmt = '"{}"'):
+  """Generate the lines of a tuple declaration as compactly as possibly within a
+  certain number of columns per line
   """
 
-  l = '{} = ("{}"'.format(name, lst[0])
+  l = [('{} = (' + fmt).format(name, lst[0])]
+  ll = len(l[0])
 
   for w in lst[1:]:
 
-    if len(l) + len(w) + 4 < cols:
-      l += ', "{}"'.format(w)
+    w = fmt.format(w)
+
+    if ll + len(w) + 2 < cols:
+      l.append(w)
+      ll += len(w) + 2
 
     else:
-      print(l + ",", file = f)
-      l = '  "{}"'.format(w)
+      yield ", ".join(l) + ","
+      l = ["  " + w]
+      ll = len(l[0])
 
-  print(l + ")", file = f)
+  yield ", ".join(l) + ")"
 
 
 
-### Main routine
-if __name__ == "__main__":
+def language_pack_lines(lang, fl, ewl):
+  """Generate the lines of a language pack from the processed frequency list and
+  extra words list
+  """
 
-  # Parse the command line arguments
-  argparser = argparse.ArgumentParser()
+  yield "# -*- coding: utf-8 -*-"
 
-  argparser.add_argument(
-	"-l", "--language",
-	help = "Only build language pack for one language (default all)",
-	type = str)
+  # Generate the description of the pack
+  for l in languages[lang]["description"]:
+    yield "# " + l
 
-  args = argparser.parse_args()
+  yield ""
 
-  if args.language and args.language not in languages:
-    print("Unknown language {}. Available: {}".format(args.language,
-		", ".join(languages)))
-    exit(-1)
+  # Generate the charset declaration
+  yield 'charset = "{}"'.format(languages[lang]["charset"])
+
+  yield ""
+
+  # Generate the keyboard declaration
+  yield "keyboard = ["
+  for i, l in enumerate(languages[lang]["keyboard"]):
+    yield '  "{}"{}'.format(l,
+		"]" if i == len(languages[lang]["keyboard"]) - 1 else ",")
 
-  # Iterate over the languages definitions
-  for lang in (args.language,) if args.language else languages:
+  yield ""
 
-    charset = languages[lang]["charset"]
+  # Generate the default_nb_letters, default_nb_attempts and default_difficulty
+  # declarations
+  for k in ("default_nb_letters", "default_nb_attempts", "default_difficulty"):
+    yield "{} = {}".format(k, languages[lang][k])
 
-    # Load and process the frequency list
-    fl = load_src(languages[lang]["frequency_list"]["src"])
-    fl = languages[lang]["frequency_list"]["normalize"](fl, charset)
+  yield ""
 
-    # Load and process the extra words list
-    ewl = load_src(languages[lang]["extra_words_list"]["src"])
-    ewl = languages[lang]["extra_words_list"]["normalize"](ewl, charset)
-    ewl = sorted(set(ewl) - set(fl))
+  # Generate the messages declaration
+  for k in languages[lang]["messages"]:
+    yield '{} = "{}"'.format(k, languages[lang]["messages"][k])
 
-    # Open the language pack file for writing
-    with open(lang + language_pack_file_ext, "w") as f:
+  yield ""
 
-      print("# -*- coding: utf-8 -*-", file = f)
+  # Generate the frequency list attribution
+  for l in languages[lang]["frequency_list"]["attribution"]:
+    yield "# " + l
 
-      # Generate the description of the pack
-      for l in languages[lang]["description"]:
-        print("# " + l, file = f)
+  # Generate the frequency list declaration (80 columns-formatted)
+  yield from tuple_declaration_cols_formatted("frequency_list", fl, 80)
 
-      print(file = f)
+  yield ""
 
-      # Generate the charset declaration
-      print('charset = "{}"'.format(charset), file = f)
+  # Generate the extra words list attribution
+  for l in languages[lang]["extra_words_list"]["attribution"]:
+    yield "# " + l
 
-      print(file = f)
+  # Generate the extra words list declaration (80 columns-formatted)
+  yield from tuple_declaration_cols_formatted("extra_words_list", ewl, 80)
 
-      # Generate the keyboard declaration
-      print("keyboard = [", file = f)
-      for i, l in enumerate(languages[lang]["keyboard"]):
-        if i:
-          print(",", file = f)
-        print('  "{}"'.format(l), end = "", file = f)
-      print("]", file = f)
+  yield ""
 
-      print(file = f)
+  # Generate the alphabet the letter counts are indexed by
+  alphabet = "".join(sorted(set("".join(fl + ewl))))
+  yield "# Letters used in the words"
+  yield 'alphabet = "{}"'.format(alphabet)
 
-      # Generate the default_nb_letters declaration
-      print("default_nb_letters = {}".
-		format(languages[lang]["default_nb_letters"]), file = f)
+  # Generate the letter counts declarations for both word lists (80
+  # columns-formatted)
+  for name, lst in (("frequency_list", fl), ("extra_words_list", ewl)):
 
-      # Generate the default_nb_attempts declaration
-      print("default_nb_attempts = {}".
-		format(languages[lang]["default_nb_attempts"]), file = f)
+    yield ""
 
-      # Generate the default_difficulty declaration
-      print("default_difficulty = {}".
-		format(languages[lang]["default_difficulty"]), file = f)
+    yield "# Number of times each letter of the alphabet appears at each " \
+		"position in"
+    yield "# the {} words of each length".format(name)
+    yield "{}_letter_counts = {{}}".format(name)
 
-      print(file = f)
+    lc = letter_counts(lst, alphabet)
+    for n in lc:
+      yield from tuple_declaration_cols_formatted("{}_letter_counts[{}]".
+		format(name, n), lc[n], 80, fmt = "{}")
 
-      # Generate the messages declaration
-      for k in languages[lang]["messages"]:
-        print('{} = "{}"'.format(k, languages[lang]["messages"][k]), file = f)
+    yield ""
 
-      print(file = f)
+    yield "# Number of {} words of each length containing each letter of " \
+		"the".format(name)
+    yield "# alphabet"
+    yield "{}_letter_words = {{}}".format(name)
 
-      # Generate the frequency list attribution
-      for l in languages[lang]["frequency_list"]["attribution"]:
-        print("# " + l, file = f)
+    lw = letter_words(lst, alphabet)
+    for n in lw:
+      yield from tuple_declaration_cols_formatted("{}_letter_words[{}]".
+		format(name, n), lw[n], 80, fmt = "{}")
 
-      # Generate the frequency list declaration (80 columns-formatted)
-      print_tuple_declaration_cols_formatted("frequency_list", fl, 80, f)
 
-      print(file = f)
 
-      # Generate the extra words list attribution
-      for l in languages[lang]["extra_words_list"]["attribution"]:
-        print("# " + l, file = f)
+def write_lines_chunked(lines, f):
+  """Write lines into a file in large blocks rather than one line at a time
+  """
+
+  b = []
+  bl = 0
+
+  for l in lines:
+
+    b.append(l)
+    bl += len(l) + 1
+
+    if bl >= write_chunk_size:
+      f.write("\n".join(b) + "\n")
+      b = []
+      bl = 0
+
+  if b:
+    f.write("\n".join(b) + "\n")
+
+
+
+def write_language_pack(lang, fl, ewl, lpfile):
+  """Write a language pack from the processed frequency list and extra words
+  list, check that it loads back correctly and only then put it in place
+  """
 
-      # Generate the extra words list declaration (80 columns-formatted)
-      print_tuple_declaration_cols_formatted("extra_words_list", ewl, 80, f)
+  tmpfile = lpfile + ".tmp"
+
+  try:
+
+    # Write the language pack into a temporary file, with the same encoding and
+    # line endings whatever the platform
+    with open(tmpfile, "w", encoding = "utf-8", newline = "\n") as f:
+      write_lines_chunked(language_pack_lines(lang, fl, ewl), f)
+
+    # Make sure the language pack loads back into the same lists
+    lp = load_language_pack(tmpfile)
+
+    if lp.frequency_list != tuple(fl) or lp.extra_words_list != tuple(ewl):
+      raise ValueError("Language pack {} doesn't load back correctly".
+		format(lpfile))
+
+  # Don't leave a partial or broken language pack behind
+  except BaseException:
+    if os.path.exists(tmpfile):
+      os.remove(tmpfile)
+    raise
+
+  os.replace(tmpfile, lpfile)
+
+
+
+def build_language_pack(lang):
+  """Build the language pack for one language
+  """
+
+  charset = languages[lang]["charset"]
+
+  # Load and process the frequency list, keeping only the first occurrence of
+  # each word
+  fl = load_src(languages[lang]["frequency_list"]["src"])
+  fl = languages[lang]["frequency_list"]["normalize"](fl, charset)
+  fl = list(dict.fromkeys(fl))
+
+  # Load and process the extra words list
+  ewl = load_src(languages[lang]["extra_words_list"]["src"])
+  ewl = languages[lang]["extra_words_list"]["normalize"](ewl, charset)
+  ewl = sorted(set(ewl) - set(fl))
+
+  # Write the language pack
+  lpfile = lang + language_pack_file_ext
+  write_language_pack(lang, fl, ewl, lpfile)
+
+  return lpfile
+
+
+
+### Main routine
+if __name__ == "__main__":
+
+  # Parse the command line arguments
+  argparser = argparse.ArgumentParser()
+
+  argparser.add_argument(
+	"-l", "--language",
+	help = "Only build language pack for one language (default all)",
+	type = str)
+
+  args = argparser.parse_args()
+
+  if args.language and args.language not in languages:
+    print("Unknown language {}. Available: {}".format(args.language,
+		", ".join(languages)))
+    exit(-1)
+
+  # Build the language packs for all the languages concurrently, each in its
+  # own process
+  langs = (args.language,) if args.language else tuple(languages)
+
+  with concurrent.futures.ProcessPoolExecutor(max_workers = len(langs)) as ex:
+    builds = {lang: ex.submit(build_language_pack, lang) for lang in langs}
+
+  # Report the language packs that failed to build
+  failed = False
+
+  for lang in langs:
+    try:
+      print("Built {}".format(builds[lang].result()))
+
+    except Exception as e:
+      print("Error building {} language pack: {}".format(lang, e))
+      failed = True
+
+  if failed:
+    exit(-1)
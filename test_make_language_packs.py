@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""Tests for the Wordle language packs builder
+"""
+
+### Modules
+import os
+
+import pytest
+
+from wordle import load_language_pack
+import make_language_packs
+
+
+
+### Parameters
+# Word lists to build the test language pack from
+frequency_list = ["KISSA", "TALO", "ÄÄNI", "KALLA", "OLLA", "SAUNA", "AA"]
+extra_words_list = ["ÄITI", "KOIRA", "TAKKA", "SIILI"]
+
+
+
+### Tests
+def test_language_pack_round_trip(tmp_path):
+  lpfile = str(tmp_path / "fi_FI.langpack")
+
+  make_language_packs.write_language_pack("fi_FI", frequency_list,
+		extra_words_list, lpfile)
+  lp = load_language_pack(lpfile)
+
+  alphabet = "".join(sorted(set("".join(frequency_list + extra_words_list))))
+
+  assert lp.frequency_list == tuple(frequency_list)
+  assert lp.extra_words_list == tuple(extra_words_list)
+  assert lp.alphabet == alphabet
+  assert lp.frequency_list_letter_counts == \
+	make_language_packs.letter_counts(frequency_list, alphabet)
+  assert lp.extra_words_list_letter_counts == \
+	make_language_packs.letter_counts(extra_words_list, alphabet)
+  assert lp.frequency_list_letter_words == \
+	make_language_packs.letter_words(frequency_list, alphabet)
+  assert lp.extra_words_list_letter_words == \
+	make_language_packs.letter_words(extra_words_list, alphabet)
+
+
+
+def test_language_pack_is_byte_identical(tmp_path):
+  lpfiles = [str(tmp_path / "{}.langpack".format(i)) for i in range(2)]
+
+  for lpfile in lpfiles:
+    make_language_packs.write_language_pack("fi_FI", frequency_list,
+		extra_words_list, lpfile)
+
+  with open(lpfiles[0], "rb") as f1, open(lpfiles[1], "rb") as f2:
+    assert f1.read() == f2.read()
+
+
+
+def test_language_pack_written_in_chunks(tmp_path, monkeypatch):
+  lpfiles = [str(tmp_path / "{}.langpack".format(i)) for i in range(2)]
+
+  make_language_packs.write_language_pack("fi_FI", frequency_list,
+		extra_words_list, lpfiles[0])
+
+  monkeypatch.setattr(make_language_packs, "write_chunk_size", 16)
+  make_language_packs.write_language_pack("fi_FI", frequency_list,
+		extra_words_list, lpfiles[1])
+
+  with open(lpfiles[0], "rb") as f1, open(lpfiles[1], "rb") as f2:
+    assert f1.read() == f2.read()
+
+
+
+def test_broken_language_pack_leaves_no_file(tmp_path, monkeypatch):
+  lpfile = str(tmp_path / "fi_FI.langpack")
+
+  monkeypatch.setitem(make_language_packs.languages["fi_FI"]["messages"],
+		"bye", 'Heippa"')
+
+  with pytest.raises(SyntaxError):
+    make_language_packs.write_language_pack("fi_FI", frequency_list,
+		extra_words_list, lpfile)
+
+  assert os.listdir(str(tmp_path)) == []
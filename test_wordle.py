@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""Tests for the Wordle game routines
+"""
+
+### Modules
+import types
+
+import wordle
+import make_language_packs
+
+
+
+### Routines
+def letter_counts(words, alphabet):
+  """Return the letter counts and counts of words containing each letter of the
+  words of a list, all of the same length, the way language packs store them
+  """
+
+  n = len(words[0])
+
+  return list(make_language_packs.letter_counts(words, alphabet)[n]), \
+		list(make_language_packs.letter_words(words, alphabet)[n])
+
+
+
+### Tests
+def test_letter_words_count_repeated_letters_once():
+  words = ["AABCD", "AAEFG", "HIJKL", "MNOPQ"]
+  alphabet = "ABCDEFGHIJKLMNOPQ"
+
+  lc, lw = letter_counts(words, alphabet)
+
+  assert wordle.letters_heat(lc, alphabet)["A"] == 4
+  assert lw[alphabet.index("A")] == 2
+
+
+
+def test_informative_letters_with_repeated_letters():
+  words = ["AABCD", "AAEFG", "HIJKL", "MNOPQ"]
+  alphabet = "ABCDEFGHIJKLMNOPQ"
+
+  _, lw = letter_counts(words, alphabet)
+
+  # A is in exactly half the words: it's the most informative letter
+  assert wordle.informative_letters(lw, alphabet, len(words), "")[0] == "A"
+  assert "A" not in wordle.informative_letters(lw, alphabet, len(words), "A")
+
+
+
+def test_remove_letter_counts_matches_recount():
+  words = ["KISSA", "KALLA", "SAUNA", "ÄÄNTÄ", "TALLI"]
+  alphabet = "AIKLNSTUÄ"
+
+  lc, lw = letter_counts(words, alphabet)
+  wordle.remove_letter_counts(lc, lw, words[1:3], alphabet)
+
+  assert (lc, lw) == letter_counts(words[:1] + words[3:], alphabet)
+
+
+
+def test_translation_table():
+  lp = types.SimpleNamespace(charset = "[A-ZÉÇ]",
+		keyboard = ["_A É Ç_"], alphabet = "ACEÉÇ")
+
+  tt = wordle.translation_table(lp)
+
+  assert tt["a"] == "A"
+  assert tt["é"] == "É"
+  assert tt["e\u0301"] == "É"
+  assert tt["E\u0301"] == "É"
+  assert tt["ç"] == "Ç"
+  assert "_" not in tt
+
+
+
+def test_translate_keys():
+  lp = types.SimpleNamespace(charset = "[A-ZÉÇ]",
+		keyboard = ["_a e\u0301 C\u0327 <_"], alphabet = "ACEÉÇ")
+
+  tt = wordle.translation_table(lp)
+
+  assert wordle.translate_keys(lp.keyboard[0], tt) == "_A É Ç <_"
+
+
+
+def type_keys(keys, letters, translation):
+  """Type characters one by one into an empty guessword and return it
+  """
+
+  guess = ""
+  k = ""
+
+  for c in keys:
+    guess, k = wordle.type_key(guess, k, c, letters, translation)
+
+  return guess
+
+
+
+def test_type_key():
+  lp = types.SimpleNamespace(charset = "[A-ZÉÇ]",
+		keyboard = ["_A E É Ç_"], alphabet = "ACEÉÇ")
+
+  tt = wordle.translation_table(lp)
+
+  assert type_keys("ae\u0301", 2, tt) == "AÉ"
+  assert type_keys("a\u0301e", 2, tt) == "AE"
+
+  # A combining character typed into a full guessword doesn't change its last
+  # letter
+  assert type_keys("aee\u0301", 2, tt) == "AE"
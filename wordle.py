@@ -14,6 +14,8 @@ import time
 import random
 import termios
 import argparse
+import unicodedata
+import collections
 import importlib.util
 import importlib.machinery
 
@@ -23,6 +25,14 @@ import importlib.machinery
 # Paths to language packs
 language_packs_path = ("/usr/share/games/wordle", ".")
 
+# Maximum memory used by the word lists of the loaded language packs (in MB)
+language_packs_max_memory = 16
+
+# Messages used with language packs that predate them
+default_messages = {
+  "howswitch":	"(TAB to change language)",
+  "hint":	"Try letters: "}
+
 # Default language packs attached to plain language names
 languages = {
   "english":	"en_GB",
@@ -42,6 +52,7 @@ alternative_program_name_language_packs = {
 BS = "\b"
 CR = "\r"
 LF = "\n"
+TAB = "\t"
 ESC = "\x1b"
 DEL = "\x7f"
 
@@ -61,6 +72,9 @@ any_ansi_seq = re.compile(ESC + r"\[.+?[mA]")
 bg_color_black = 40
 bg_color_green = 42
 bg_color_yellow = 43
+bg_color_blue = 44
+bg_color_magenta = 45
+bg_color_cyan = 46
 bg_color_lightgrey = 47
 bg_color_grey = 100
 bg_color_white = 107
@@ -76,6 +90,90 @@ color_letter_unused = set_colors.format(bg_color_lightgrey, fg_color_black)
 color_letter_empty = set_colors.format(bg_color_white, fg_color_white)
 color_letter_normal = attribute_reset
 
+# Colors for the unused letters in the keyboard heat map, from the letters
+# least present in the possible words to the letters most present
+color_letter_heat = (
+  color_letter_unused,
+  set_colors.format(bg_color_cyan, fg_color_black),
+  set_colors.format(bg_color_blue, fg_color_white),
+  set_colors.format(bg_color_magenta, fg_color_white))
+
+# Number of most informative untried letters to give as hints
+nb_hint_letters = 3
+
+# Language pack variables holding word lists and the letter counts tables
+# worked out from them
+language_pack_word_lists = ("frequency_list", "extra_words_list",
+			"frequency_list_letter_counts",
+			"extra_words_list_letter_counts",
+			"frequency_list_letter_words",
+			"extra_words_list_letter_words")
+
+# Language pack variables needed to show the keyboard heat map and the hints
+language_pack_letter_counts = ("alphabet", "frequency_list_letter_counts",
+			"frequency_list_letter_words")
+
+# Value returned by the game when the user asks to switch language
+switch_language = 1
+
+
+
+### Classes
+class LanguagePacks:
+  """Cache of loaded Wordle language packs. The word lists of the least
+  recently used language packs are released when the memory they use exceeds
+  the maximum. The rest of the evicted language packs is kept, and their word
+  lists are put back into them when they're used again
+  """
+
+  def __init__(self, lpfiles, max_memory):
+    """Initialize the cache with the paths of the language pack files and the
+    maximum memory the word lists may use (in bytes)
+    """
+
+    self.lpfiles = lpfiles
+    self.max_memory = max_memory
+
+    # Loaded language packs, with or without their word lists
+    self.lps = {}
+
+    # Memory used by the word lists of the language packs that still have
+    # them, least recently used first
+    self.sizes = collections.OrderedDict()
+
+
+
+  def get(self, lpname):
+    """Return a language pack with its word lists, loading it if needed
+    """
+
+    if lpname in self.sizes:
+      self.sizes.move_to_end(lpname)
+      return self.lps[lpname]
+
+    # Load the language pack, and only put its word lists back into it if it
+    # was evicted before
+    lp = load_language_pack(self.lpfiles[lpname])
+
+    if lpname in self.lps:
+      for wl in language_pack_word_lists:
+        if hasattr(lp, wl):
+          setattr(self.lps[lpname], wl, getattr(lp, wl))
+      lp = self.lps[lpname]
+
+    self.lps[lpname] = lp
+    self.sizes[lpname] = word_lists_size(lp)
+
+    # Release the word lists of the least recently used language packs, but
+    # always keep the language pack just loaded
+    while len(self.sizes) > 1 and sum(self.sizes.values()) > self.max_memory:
+      elpname, _ = self.sizes.popitem(last = False)
+      for wl in language_pack_word_lists:
+        if hasattr(self.lps[elpname], wl):
+          delattr(self.lps[elpname], wl)
+
+    return lp
+
 
 
 ### Routines
@@ -88,10 +186,98 @@ def load_language_pack(lpfile):
   lp = importlib.util.module_from_spec(spec)
   spec.loader.exec_module(lp)
 
+  # Work out what the user may type for each letter once and for all
+  lp.translation = translation_table(lp)
+
+  # Spell the keys of the keyboard like the letters of the words, so they may be
+  # defined in lower case or decomposed
+  lp.keyboard = [translate_keys(l, lp.translation) for l in lp.keyboard]
+
   return lp
 
 
 
+def translation_table(lp):
+  """Return a table translating every character or sequence of characters the
+  user may type for a letter of a language pack - upper or lower case,
+  precomposed or decomposed - into that letter
+  """
+
+  # Letters of the language pack: the keys of the keyboard and the letters used
+  # in the words that match the charset
+  cs = re.compile("^{}$".format(lp.charset))
+  letters = [c for c in dict.fromkeys("".join(lp.keyboard) +
+		getattr(lp, "alphabet", "")) if cs.match(c)]
+
+  return {unicodedata.normalize(nf, c): l for l in letters \
+		for c in (l, l.lower()) for nf in ("NFC", "NFD")}
+
+
+
+def type_key(guess, keys, c, letters, translation):
+  """Type a character into a guessword: add the letter it stands for if there's
+  still room, or replace the last letter of the guessword if the character
+  combines with the characters typed for it into another letter. Return the
+  new guessword and the characters typed for its last letter
+  """
+
+  # Add a letter if there's still room. Otherwise forget the characters typed
+  # for the last letter, so nothing typed after can combine with it
+  if c in translation:
+    if len(guess) < letters:
+      return guess + translation[c], c
+    return guess, ""
+
+  # Replace the last letter if the character combines with it
+  if guess and keys and keys + c in translation:
+    return guess[:-1] + translation[keys + c], keys + c
+
+  return guess, keys
+
+
+
+def translate_keys(kbdline, translation):
+  """Translate the keys of a keyboard line into the letters they stand for,
+  keeping the combining characters with the character they follow
+  """
+
+  keys = []
+
+  for c in kbdline:
+    if keys and unicodedata.combining(c):
+      keys[-1] += c
+    else:
+      keys.append(c)
+
+  return "".join(translation.get(k, k) for k in keys)
+
+
+
+def word_lists_size(lp):
+  """Return the approximate memory used by the word lists of a language pack
+  and their letter counts tables
+  """
+
+  size = 0
+
+  for wl in language_pack_word_lists:
+
+    l = getattr(lp, wl, ())
+
+    # Letter counts tables are dictionaries of tuples of counts
+    if isinstance(l, dict):
+      size += sys.getsizeof(l)
+      l = l.values()
+
+    else:
+      l = (l,)
+
+    size += sum(sys.getsizeof(t) + sum(sys.getsizeof(e) for e in t) for t in l)
+
+  return size
+
+
+
 def colored_guess(word, guess, spent_letters):
   """Return a colored guessword
   """
@@ -123,8 +309,71 @@ def colored_guess(word, guess, spent_letters):
 
 
 
-def colored_kbdline(word, kbdline, spent_letters, found_letters):
-  """Return a colored keyboard line
+def has_words(lp, letters):
+  """Return whether a language pack has words of a certain number of letters to
+  choose from
+  """
+
+  return any(len(w) == letters for w in lp.frequency_list)
+
+
+
+def has_letter_counts(lp):
+  """Return whether a language pack has the letter counts tables
+  """
+
+  return all(hasattr(lp, v) for v in language_pack_letter_counts)
+
+
+
+def remove_letter_counts(lc, lw, words, alphabet):
+  """Remove the letters of words from letter counts indexed by
+  position * len(alphabet) + letter index, and the words from counts of words
+  containing each letter indexed by letter index
+  """
+
+  n = len(alphabet)
+  ai = {c: i for i, c in enumerate(alphabet)}
+
+  for w in words:
+
+    for i, c in enumerate(w):
+      lc[i * n + ai[c]] -= 1
+
+    for c in set(w):
+      lw[ai[c]] -= 1
+
+
+
+def letters_heat(lc, alphabet):
+  """Return how many times each letter of the alphabet appears in all positions
+  from letter counts indexed by position * len(alphabet) + letter index
+  """
+
+  n = len(alphabet)
+
+  return {c: sum(lc[i::n]) for i, c in enumerate(alphabet)}
+
+
+
+def informative_letters(lw, alphabet, nb_words, spent_letters):
+  """Return the untried letters that best split the possible words in two
+  halves, most informative first, from counts of words containing each letter
+  of the alphabet indexed by letter index
+  """
+
+  # Score the letters found in closest to half the possible words the highest
+  scores = {c: min(lw[i], nb_words - lw[i]) for i, c in enumerate(alphabet) \
+		if c not in spent_letters}
+
+  return [c for c in sorted(scores, key = lambda c: -scores[c]) \
+		if scores[c] > 0][:nb_hint_letters]
+
+
+
+def colored_kbdline(word, kbdline, spent_letters, found_letters, heat = None):
+  """Return a colored keyboard line, with the unused letters colored according
+  to their heat level if a heat map is supplied
   """
 
   s = ""
@@ -135,7 +384,8 @@ def colored_kbdline(word, kbdline, spent_letters, found_letters):
       s += color_letter_empty + " "
 
     elif c not in spent_letters :
-      s += color_letter_unused + c
+      s += (color_letter_heat[heat[c]] if heat and c in heat \
+		else color_letter_unused) + c
 
     elif c in found_letters:
       s += color_letter_found + c
@@ -172,7 +422,7 @@ def readchar():
 
 
 
-def game(letters, attempt, difficulty):
+def game(letters, attempt, difficulty, heat_map = False, hints = False):
   """Wordle game proper
   """
 
@@ -185,14 +435,25 @@ def game(letters, attempt, difficulty):
   mdiff = "{}{}/5".format(lp.difficulty, difficulty)
   mlsize = "{}{}".format(len(pws), lp.poswords)
 
+  # How to switch language, if there's more than one
+  howswitch = getattr(lp, "howswitch", default_messages["howswitch"]) \
+		if len(lpnames) > 1 else ""
+
+  # Message introducing the hints, if required
+  hint = getattr(lp, "hint", default_messages["hint"]) if hints else ""
+
   # Calculate the maximum line length
   maxll = 2 + max(len(mdiff), len(mlsize), len(lp.howquit), letters * 3,
 		len(lp.keyboard[0]), len(lp.guess) + letters, len(lp.won),
-		len(lp.lost), len(lp.again) + 1, len(lp.bye))
+		len(lp.lost), len(lp.again) + 1, len(lp.bye), len(howswitch),
+		len(hint) + nb_hint_letters * 2 - 1 if hint else 0)
+
+  # Number of lines of the keyboard, including the hint line
+  kbdlines = len(lp.keyboard) + (1 if hints else 0)
 
   # Create the list of possible user entries from the frequency list and the
   # extra words list
-  ues = pws + [w for w in lp.extra_words_list if len(w) == letters]
+  ues = set(pws + [w for w in lp.extra_words_list if len(w) == letters])
 
   print()
 
@@ -204,7 +465,21 @@ def game(letters, attempt, difficulty):
   if len(pws) < 1:
     return -1
 
-  cprint(maxll, lp.howquit, end = CR + LF * 2)
+  # Count the letters in the list of words to choose from from the precomputed
+  # frequency list letter counts, minus the words excluded by the difficulty
+  # level
+  if heat_map or hints:
+    pwslc = list(lp.frequency_list_letter_counts[letters])
+    pwslw = list(lp.frequency_list_letter_words[letters])
+    remove_letter_counts(pwslc, pwslw, [w for w in lp.frequency_list \
+		if len(w) == letters][len(pws):], lp.alphabet)
+
+  # Display how to quit, and how to switch language if there's more than one
+  if howswitch:
+    cprint(maxll, lp.howquit)
+    cprint(maxll, howswitch, end = CR + LF * 2)
+  else:
+    cprint(maxll, lp.howquit, end = CR + LF * 2)
 
   # Run the game continuously
   while True:
@@ -219,9 +494,15 @@ def game(letters, attempt, difficulty):
 
     guess = ""
 
+    # Reset the list of possible words and their letter counts
+    if heat_map or hints:
+      cws = pws
+      cwslc = list(pwslc)
+      cwslw = list(pwslw)
+
     # Wipe the game area clean and move the cursor back to the top left
-    print((" " * maxll + CR + LF) * (attempts + len(lp.keyboard) + 8), end = "")
-    print(x_lines_up.format(attempts + len(lp.keyboard) + 8), end = "")
+    print((" " * maxll + CR + LF) * (attempts + kbdlines + 8), end = "")
+    print(x_lines_up.format(attempts + kbdlines + 8), end = "")
 
     for t in range(attempts + 1):
 
@@ -236,9 +517,23 @@ def game(letters, attempt, difficulty):
 
       print()
 
-      # Print the keyboard
+      # Print the keyboard, as a heat map of how much the letters are present
+      # in the possible words if required
+      if heat_map:
+        heat = letters_heat(cwslc, lp.alphabet)
+        maxheat = max(1, max(heat.values()))
+        hm = {c: 0 if not heat[c] else \
+		min(3, 1 + 3 * heat[c] // maxheat) for c in heat}
+
       for l in lp.keyboard:
-        cprint(maxll, colored_kbdline(word, l, spent_letters, found_letters))
+        cprint(maxll, colored_kbdline(word, l, spent_letters, found_letters,
+		hm if heat_map else None))
+
+      # Print the most informative untried letters if required
+      if hints:
+        il = informative_letters(cwslw, lp.alphabet, len(cws), spent_letters)
+        cprint(maxll, hint + " ".join(il) +
+		" " * (nb_hint_letters * 2 - 1 - len(" ".join(il))))
 
       print()
 
@@ -251,6 +546,7 @@ def game(letters, attempt, difficulty):
       # hits ESC twice or enters a guessword that is in the possible user
       # entries list
       guess = ""
+      keys = ""
       escapes = 0
 
       cprint(maxll, lp.guess + "_" * letters, end = BS * letters, flush = True)
@@ -258,7 +554,7 @@ def game(letters, attempt, difficulty):
       while True:
 
         # Read a single character
-        c = readchar().upper()
+        c = readchar()
 
         # Count successive ESC characters
         escapes = escapes + 1 if c == ESC else 0
@@ -267,6 +563,7 @@ def game(letters, attempt, difficulty):
         if c == DEL:
           if guess:
             guess = guess[:-1]
+            keys = ""
             print(BS + "_", end = BS, flush = True)
 
         # Validate the guessword if it's in the possible user entries list
@@ -274,11 +571,18 @@ def game(letters, attempt, difficulty):
           if guess in ues:
             break
 
-        # Add a letter to the guessword if there's still room
-        elif re.match("^{}$".format(lp.charset), c):
-          if len(guess) < letters:
-            guess += c
-            print(c, end = "", flush = True)
+        # Add a letter to the guessword, or replace its last letter if the
+        # character combines with the characters typed for it
+        elif c in lp.translation or unicodedata.combining(c):
+          g, keys = type_key(guess, keys, c, letters, lp.translation)
+
+          if len(g) > len(guess):
+            print(g[-1], end = "", flush = True)
+
+          elif g != guess:
+            print(BS + g[-1], end = "", flush = True)
+
+          guess = g
 
         # Quit if ESC twice
         elif escapes == 2:
@@ -298,8 +602,17 @@ def game(letters, attempt, difficulty):
         if word[i] == c:
           found_letters += c
 
+      # Remove the words that the guessword rules out from the possible words
+      # and their letters from the letter counts
+      if heat_map or hints:
+        cg = colored_guess(word, guess, "")
+        m = [colored_guess(w, guess, "") == cg for w in cws]
+        remove_letter_counts(cwslc, cwslw,
+		[w for w, k in zip(cws, m) if not k], lp.alphabet)
+        cws = [w for w, k in zip(cws, m) if k]
+
       # Move the cursor back to the top left
-      print(x_lines_up.format(attempts + len(lp.keyboard) + 2), end = CR)
+      print(x_lines_up.format(attempts + kbdlines + 2), end = CR)
 
     # Display whether the user won or lost, and what the word was if they lost
     if guess == word:
@@ -313,13 +626,18 @@ def game(letters, attempt, difficulty):
     cprint(maxll, lp.again + "_", end = BS, flush = True)
     c = readchar()
 
+    # Switch to the next language if the user hit TAB
+    if c == TAB and len(lpnames) > 1:
+      print(CR + LF)
+      return switch_language
+
     if c.upper() != lp.yes and c != CR:
       print(CR + LF)
       cprint(maxll, lp.bye, end = CR + LF * 2)
       break
 
     # Move the cursor back to the top left
-    print(x_lines_up.format(attempts + len(lp.keyboard) + 7), end = CR)
+    print(x_lines_up.format(attempts + kbdlines + 7), end = CR)
 
   return 0
 
@@ -367,10 +685,33 @@ if __name__ == "__main__":
 	help = "1 -> 5 - Word chosen between most common and rarest words",
 	type = int)
 
+  argparser.add_argument(
+	"-k", "--heat-map",
+	help = "Color the unused keys according to how much their letters are "
+		"present in the possible words",
+	action = "store_true")
+
+  argparser.add_argument(
+	"-i", "--hints",
+	help = "Show the most informative untried letters",
+	action = "store_true")
+
+  argparser.add_argument(
+	"-m", "--max-memory",
+	help = "Maximum memory used by the word lists of the language packs "
+		"kept loaded in MB (default {})".format(language_packs_max_memory),
+	type = int,
+	default = language_packs_max_memory)
+
   args = argparser.parse_args()
 
 
 
+  # Did the user specify a valid maximum memory for the language packs?
+  if args.max_memory < 0:
+    print("Invalid maximum memory {}".format(args.max_memory))
+    exit(-1)
+
   # Did the user specify a language pack to load?
   if args.language_pack:
     lpname = args.language_pack
@@ -393,13 +734,19 @@ if __name__ == "__main__":
   if lpname not in lps:
     print("Language pack {} not available".format(lpname))
     exit(-1)
-  lp = load_language_pack(lps[lpname])
+  lpcache = LanguagePacks(lps, args.max_memory * 1024 * 1024)
+  lp = lpcache.get(lpname)
+
+  # Does the language pack have what the heat map and the hints need?
+  if (args.heat_map or args.hints) and not has_letter_counts(lp):
+    print("Language pack {} has no letter counts for the heat map or the hints".
+		format(lpname))
+    exit(-1)
 
   # Did the user specify a number of letters?
   letters = lp.default_nb_letters
   if args.nb_letters is not None:
-    if args.nb_letters < 2 or \
-	args.nb_letters > sorted(len(w) for w in lp.frequency_list)[-1]:
+    if args.nb_letters < 2 or not has_words(lp, args.nb_letters):
       print("Invalid number of letters {}".format(args.nb_letters))
       exit(-1)
     letters = args.nb_letters
@@ -421,5 +768,31 @@ if __name__ == "__main__":
 
 
 
-  # Run the game
-  exit(game(letters, attempts, difficulty))
+  # Run the game, switching to the next language pack every time the user asks
+  lpnames = sorted(lps)
+
+  while True:
+
+    # Only show the heat map and the hints with language packs that have the
+    # letter counts tables
+    r = game(letters, attempts, difficulty,
+		args.heat_map and has_letter_counts(lp),
+		args.hints and has_letter_counts(lp))
+    if r != switch_language:
+      exit(r)
+
+    lpname = lpnames[(lpnames.index(lpname) + 1) % len(lpnames)]
+    lp = lpcache.get(lpname)
+
+    # Use the new language pack's default parameters unless the user specified
+    # them, or specified a number of letters it has no words of
+    if args.nb_letters is not None and has_words(lp, args.nb_letters):
+      letters = args.nb_letters
+    else:
+      letters = lp.default_nb_letters
+
+    if args.attempts is None:
+      attempts = lp.default_nb_attempts
+
+    if args.difficulty is None:
+      difficulty = lp.default_difficulty